@@ -1,6 +1,7 @@
 import audioop
+import collections
 import logging
-import queue
+import os
 import threading
 import time
 
@@ -11,21 +12,8 @@ logger = logging.getLogger(__name__)
 SAMPLE_WIDTH = 2  # 16-bit PCM
 CHANNELS = 1  # mono
 
-
-def _upsample(chunk: bytes, src_rate: int, dst_rate: int) -> bytes:
-    if src_rate == dst_rate:
-        return chunk  # nothing to do
-
-    # state None ⇒ filter state kept inside audioop (per-call ok for small chunks)
-    converted, _ = audioop.ratecv(
-        chunk,  # fragment
-        SAMPLE_WIDTH,  # width
-        CHANNELS,  # nchannels
-        src_rate,  # inrate
-        dst_rate,  # outrate
-        None,  # state
-    )
-    return converted
+# Queued by add_chunk after a gap in the stream, so the audio thread resets its resampler state at that point in the stream
+_RESAMPLER_RESET = object()
 
 
 class RealtimeAudioOutputManager:
@@ -33,110 +21,206 @@ class RealtimeAudioOutputManager:
         self.play_raw_audio_callback = play_raw_audio_callback
         self.sleep_time_between_chunks_seconds = sleep_time_between_chunks_seconds
 
-        self.audio_queue = queue.Queue()
+        # Single producer (add_chunk_inner) / single consumer (_process_audio_queue). deque.append and deque.popleft
+        # are atomic, so we don't need queue.Queue's lock + condition on every chunk. The event is only used to wake
+        # the consumer when the queue was empty.
+        self.audio_queue = collections.deque()
+        self.audio_queue_not_empty = threading.Event()
         self.audio_thread = None
-        self.stop_audio_thread = False
+        self.stop_audio_thread = threading.Event()
         self.last_chunk_time = None
         self.thread_lock = threading.Lock()
 
         self.output_sample_rate = output_sample_rate
         self.bytes_per_sample = 2
         self.chunk_length_seconds = 0.1
-        self.inner_chunk_buffer = b""
-        self.last_chunk_time = time.time()
+        self._chunk_size_bytes_by_sample_rate = {}
+        self.inner_chunk_buffer = bytearray()
+        # Monotonic clock, only used for measuring gaps between chunks
+        self.last_chunk_time = time.monotonic()
+
+        # Scratch buffer reused for every upsampled chunk. Only touched by the audio thread, so no lock needed.
+        self._upsample_scratch = np.empty(0, dtype=np.int16)
+        self._upsample_views = {}
+        # audioop.ratecv filter state, carried across chunks so the stream is resampled continuously. Only touched by the audio thread.
+        self._ratecv_states = {}
+        # Upsampling function specialized for the last seen input sample rate
+        self._upsample_fn = None
+        self._upsample_fn_sample_rate = None
 
     def add_chunk(self, chunk, sample_rate):
         # If it's been a while since we had a chunk, there's probably some "residue" in the buffer. Clear it.
-        if time.time() - self.last_chunk_time > 0.15:
-            self.inner_chunk_buffer = b""
-        self.last_chunk_time = time.time()
-
-        self.inner_chunk_buffer += chunk
-        chunk_size_bytes = int(self.bytes_per_sample * self.chunk_length_seconds * sample_rate)
+        now = time.monotonic()
+        if now - self.last_chunk_time > 0.15:
+            self.inner_chunk_buffer.clear()
+            # The resampler state is only touched by the audio thread, so it is reset there, after the chunks queued before the gap
+            self.audio_queue.append(_RESAMPLER_RESET)
+        self.last_chunk_time = now
+
+        # Grow the buffer in place and trim it from the front, instead of rebuilding it on every call
+        self.inner_chunk_buffer.extend(chunk)
+        chunk_size_bytes = self._chunk_size_bytes_by_sample_rate.get(sample_rate)
+        if chunk_size_bytes is None:
+            chunk_size_bytes = int(self.bytes_per_sample * self.chunk_length_seconds * sample_rate)
+            self._chunk_size_bytes_by_sample_rate[sample_rate] = chunk_size_bytes
         while len(self.inner_chunk_buffer) >= chunk_size_bytes:
-            self.add_chunk_inner(self.inner_chunk_buffer[:chunk_size_bytes], sample_rate)
-            self.inner_chunk_buffer = self.inner_chunk_buffer[chunk_size_bytes:]
+            # Slicing a memoryview doesn't copy, so bytes() is the only copy. The view has to be released
+            # before the bytearray is resized, so it can't be kept around between calls.
+            with memoryview(self.inner_chunk_buffer) as inner_chunk_buffer_view:
+                chunk_to_add = bytes(inner_chunk_buffer_view[:chunk_size_bytes])
+            self.add_chunk_inner(chunk_to_add, sample_rate)
+            del self.inner_chunk_buffer[:chunk_size_bytes]
 
     def add_chunk_inner(self, chunk, sample_rate):
         """Add a single chunk of PCM audio to the stream buffer."""
-        self.audio_queue.put((chunk, sample_rate))
-        self.last_chunk_time = time.time()
+        self.audio_queue.append((chunk, sample_rate))
+        self.audio_queue_not_empty.set()
+        # last_chunk_time was already updated by add_chunk
 
         # If thread is alive, we don't need to mess with the lock
-        if not (self.audio_thread is None or not self.audio_thread.is_alive()):
+        audio_thread = self.audio_thread
+        if audio_thread is not None and audio_thread.is_alive():
             return
 
         # Start audio thread if not already running
         with self.thread_lock:
-            if self.audio_thread is None or not self.audio_thread.is_alive():
+            audio_thread = self.audio_thread
+            if audio_thread is None or not audio_thread.is_alive():
                 self._start_audio_thread()
                 logger.info("RealtimeAudioOutputManager: Audio thread started")
 
     def _start_audio_thread(self):
         """Start the audio output thread."""
-        self.stop_audio_thread = False
+        self.stop_audio_thread.clear()
         self.audio_thread = threading.Thread(target=self._process_audio_queue, daemon=True)
         self.audio_thread.start()
 
+    def _raise_audio_thread_priority(self):
+        """Try to run the calling (audio) thread at realtime priority so it isn't starved on a loaded host."""
+        # SCHED_RR needs CAP_SYS_NICE. Fall back to a lower nice value, and otherwise to normal priority.
+        try:
+            os.sched_setscheduler(0, os.SCHED_RR, os.sched_param(10))
+            return
+        except (AttributeError, OSError):
+            pass
+
+        try:
+            os.nice(-5)
+        except (AttributeError, OSError):
+            logger.info("RealtimeAudioOutputManager: Could not raise audio thread priority, running at normal priority")
+
     def _process_audio_queue(self):
         """Process audio chunks from the queue until timeout or stop signal."""
         timeout_seconds = 10
 
-        while not self.stop_audio_thread:
-            try:
-                # Wait for audio chunk with timeout
-                chunk, sample_rate = self.audio_queue.get(timeout=1.0)
-
-                # Upsample the chunk to the output sample rate
-                chunk_upsampled = self.upsample_chunk_to_output_sample_rate(chunk, sample_rate)
-
-                # Play the chunk
-                self.play_raw_audio_callback(bytes=chunk_upsampled, sample_rate=self.output_sample_rate)
+        self._raise_audio_thread_priority()
 
-                # Sleep between chunks
-                time.sleep(self.sleep_time_between_chunks_seconds * self.chunk_length_seconds)
+        while not self.stop_audio_thread.is_set():
+            try:
+                item = self.audio_queue.popleft()
+            except IndexError:
+                # Queue is empty. Clear the event before re-checking so a chunk added in between isn't missed.
+                self.audio_queue_not_empty.clear()
+                if self.audio_queue:
+                    continue
 
-            except queue.Empty:
                 # Check if we should timeout due to no new chunks
-                if self.last_chunk_time and time.time() - self.last_chunk_time > timeout_seconds:
+                idle_seconds_remaining = timeout_seconds - (time.monotonic() - self.last_chunk_time)
+                if idle_seconds_remaining <= 0:
                     break
+
+                # Block until a chunk arrives, cleanup wakes us, or the idle timeout is reached. No periodic polling.
+                self.audio_queue_not_empty.wait(timeout=idle_seconds_remaining)
                 continue
 
+            if item is _RESAMPLER_RESET:
+                self._ratecv_states.clear()
+                continue
+            chunk, sample_rate = item
+
+            # Upsample the chunk to the output sample rate
+            chunk_upsampled = self.upsample_chunk_to_output_sample_rate(chunk, sample_rate)
+
+            # Play the chunk
+            self.play_raw_audio_callback(bytes=chunk_upsampled, sample_rate=self.output_sample_rate)
+
+            # Sleep between chunks. Waiting on the stop event instead of time.sleep lets cleanup interrupt the sleep.
+            self.stop_audio_thread.wait(self.sleep_time_between_chunks_seconds * self.chunk_length_seconds)
+
         logger.info("RealtimeAudioOutputManager: Audio thread exited")
 
     def upsample_chunk_to_output_sample_rate(self, chunk, sample_rate):
+        # The input sample rate almost never changes mid-stream, so we pick the upsampling strategy once per
+        # sample rate and skip the ratio checks on every chunk
+        if sample_rate != self._upsample_fn_sample_rate:
+            self._upsample_fn = self._make_upsample_fn(sample_rate)
+            self._upsample_fn_sample_rate = sample_rate
+        return self._upsample_fn(chunk)
+
+    def _make_upsample_fn(self, sample_rate):
+        output_sample_rate = self.output_sample_rate
+
         # If sample rates are the same, no upsampling needed
-        if sample_rate == self.output_sample_rate:
-            return chunk, sample_rate
+        if sample_rate == output_sample_rate:
+            return lambda chunk: chunk
 
         # Calculate upsampling ratio
-        ratio = self.output_sample_rate // sample_rate
+        ratio = output_sample_rate // sample_rate
 
         # We can't upsample if the ratio is not an integer
-        if self.output_sample_rate % sample_rate != 0 or ratio <= 1:
+        if output_sample_rate % sample_rate != 0 or ratio <= 1:
             # Use the python upsample function if we have to. Repeating the samples actually performs better
             # but it only works when the ratio is an integer.
-            return _upsample(chunk, sample_rate, self.output_sample_rate)
+            return lambda chunk: self._upsample(chunk, sample_rate, output_sample_rate)
+
+        return lambda chunk: self._repeat_samples(chunk, ratio)
 
+    def _repeat_samples(self, chunk, ratio):
         # Convert bytes to 16-bit samples (assuming 16-bit PCM)
         samples = np.frombuffer(chunk, dtype=np.int16)
 
+        # Chunks are almost always the same size, so the (n, ratio) view into the scratch buffer is cached
+        # and we skip re-slicing and re-shaping it on every chunk
+        upsampled_view = self._upsample_views.get((samples.size, ratio))
+        if upsampled_view is None:
+            # Grow the scratch buffer if this chunk is bigger than any we've seen before
+            upsampled_size = samples.size * ratio
+            if self._upsample_scratch.size < upsampled_size:
+                self._upsample_scratch = np.empty(upsampled_size, dtype=np.int16)
+                self._upsample_views = {}
+            upsampled_view = self._upsample_scratch[:upsampled_size].reshape(-1, ratio)
+            self._upsample_views[(samples.size, ratio)] = upsampled_view
+
         # Repeat each sample 'ratio' times (e.g., [1,2,3] -> [111,222,333])
-        upsampled_samples = np.repeat(samples, ratio)
+        # Broadcasting into a (n, ratio) view is a plain vectorized copy, which is faster than np.repeat
+        upsampled_view[:] = samples[:, None]
 
         # Convert back to bytes
-        return upsampled_samples.tobytes()
+        return upsampled_view.tobytes()
+
+    def _upsample(self, chunk: bytes, src_rate: int, dst_rate: int) -> bytes:
+        if src_rate == dst_rate:
+            return chunk  # nothing to do
+
+        state = self._ratecv_states.get((src_rate, dst_rate))
+        converted, state = audioop.ratecv(
+            chunk,  # fragment
+            SAMPLE_WIDTH,  # width
+            CHANNELS,  # nchannels
+            src_rate,  # inrate
+            dst_rate,  # outrate
+            state,  # state
+        )
+        self._ratecv_states[(src_rate, dst_rate)] = state
+        return converted
 
     def cleanup(self):
         """Stop the audio output thread and clear the queue."""
-        self.stop_audio_thread = True
+        self.stop_audio_thread.set()
 
-        # Clear the queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
+        # Clear the queue and wake the audio thread so it sees the stop signal
+        self.audio_queue.clear()
+        self.audio_queue_not_empty.set()
 
         # Wait for thread to finish
         if self.audio_thread and self.audio_thread.is_alive():
@@ -24,6 +24,8 @@ from bots.models import Bot, GoogleMeetBotLogin
 
 logger = logging.getLogger(__name__)
 
+GOOGLE_MEET_SIGN_IN_SESSION_REDIS_KEY_PREFIX = "google_meet_sign_in_session:"
+
 
 def get_google_meet_set_cookie_url(session_id):
     base_url = build_site_url(reverse("bot_sso:google_meet_set_cookie"))
@@ -34,7 +36,7 @@ def get_google_meet_set_cookie_url(session_id):
 
 def create_google_meet_sign_in_session(bot: Bot, google_meet_bot_login: GoogleMeetBotLogin):
     session_id = str(uuid.uuid4())
-    redis_key = f"google_meet_sign_in_session:{session_id}"
+    redis_key = f"{GOOGLE_MEET_SIGN_IN_SESSION_REDIS_KEY_PREFIX}{session_id}"
     redis_url = os.getenv("REDIS_URL") + ("?ssl_cert_reqs=none" if os.getenv("DISABLE_REDIS_SSL") else "")
     redis_client = redis.from_url(redis_url)
     # Save for 30 minutes
@@ -47,7 +49,7 @@ def create_google_meet_sign_in_session(bot: Bot, google_meet_bot_login: GoogleMe
 
 
 def get_bot_login_for_google_meet_sign_in_session(session_id):
-    redis_key = f"google_meet_sign_in_session:{session_id}"
+    redis_key = f"{GOOGLE_MEET_SIGN_IN_SESSION_REDIS_KEY_PREFIX}{session_id}"
     redis_url = os.getenv("REDIS_URL") + ("?ssl_cert_reqs=none" if os.getenv("DISABLE_REDIS_SSL") else "")
     redis_client = redis.from_url(redis_url)
     session_data_raw = redis_client.get(redis_key)
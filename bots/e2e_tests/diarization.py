@@ -5,10 +5,13 @@ import concurrent.futures
 import json
 import sys
 import time
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ----------------------------
 # Helpers / HTTP
@@ -21,6 +24,10 @@ class AttendeeClient:
     def __init__(self, base_url: str, api_key: str, timeout=30):
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
+        # Keep enough pooled keep-alive connections for the concurrent per-bot calls, and retry transient gateway errors
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504)))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(
             {
                 "Authorization": f"Token {api_key}",
@@ -84,12 +91,14 @@ class AttendeeClient:
         """
 
         # First attempt: JSON body with base64
-        b64_data = base64.b64encode(audio_path.read_bytes()).decode("ascii")
-        json_payload = {"type": "audio/mp3", "data": b64_data}
+        # Base64 output never needs JSON escaping, so the body is assembled from bytes directly instead of
+        # decoding the (large) base64 string and pushing it through json.dumps.
+        b64_data = base64.b64encode(audio_path.read_bytes())
+        body = b"".join((b'{"type": "audio/mp3", "data": "', b64_data, b'"}'))
         url = self._url(f"/api/v1/bots/{bot_id}/output_audio")
 
         # Temporarily override content-type to JSON for this call (session default is JSON anyway)
-        r = self.session.post(url, data=json.dumps(json_payload), timeout=self.timeout)
+        r = self.session.post(url, data=body, timeout=self.timeout)
         if r.status_code == 200:
             return
 
@@ -122,16 +131,27 @@ def state_is_joined_recording(state: str) -> bool:
     return "joined" in s and "record" in s
 
 
-def wait_for_state(client: AttendeeClient, bot_id: str, predicate, desc: str, timeout_s: int, poll_s: float = 2.0) -> Dict:
-    start = time.time()
+def wait_for_state(client: AttendeeClient, bot_id: str, predicate, desc: str, timeout_s: int, poll_s: float = 0.25, max_poll_s: float = 2.0) -> Dict:
+    start = time.monotonic()
     while True:
         bot = client.get_bot(bot_id)
         state = str(bot.get("state", ""))
         if predicate(state, bot):
             return bot
-        if (time.time() - start) > timeout_s:
+        if (time.monotonic() - start) > timeout_s:
             raise TimeoutError(f"Timed out waiting for state '{desc}'. Last state={state!r}")
         time.sleep(poll_s)
+        # Poll quickly at first so fast state changes are noticed quickly, then back off
+        poll_s = min(poll_s * 1.5, max_poll_s)
+
+
+def wait_for_states(client: AttendeeClient, bot_ids: List[str], predicate, desc: str, timeout_s: int) -> List[Dict]:
+    """
+    Run wait_for_state for several bots concurrently, so the total wait is the slowest bot rather than the sum.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(bot_ids)) as pool:
+        futs = [pool.submit(wait_for_state, client, bot_id, predicate, desc, timeout_s) for bot_id in bot_ids]
+        return [fut.result() for fut in futs]
 
 
 def main():
@@ -178,9 +198,7 @@ def main():
     def _pred_joined(state: str, bot_obj: Dict) -> bool:
         return state_is_joined_recording(state)
 
-    wait_for_state(client, bot1_id, _pred_joined, "joined_recording", args.join_timeout)
-    wait_for_state(client, bot2_id, _pred_joined, "joined_recording", args.join_timeout)
-    wait_for_state(client, recorder_id, _pred_joined, "joined_recording", args.join_timeout)
+    wait_for_states(client, [bot1_id, bot2_id, recorder_id], _pred_joined, "joined_recording", args.join_timeout)
 
     if args.speak_wait > 0:
         if args.verbose:
@@ -231,9 +249,7 @@ def main():
     def _pred_ended(state: str, bot_obj: Dict) -> bool:
         return (state or "").strip().lower() == "ended"
 
-    wait_for_state(client, bot1_id, _pred_ended, "ended", args.end_timeout)
-    wait_for_state(client, bot2_id, _pred_ended, "ended", args.end_timeout)
-    wait_for_state(client, recorder_id, _pred_ended, "ended", args.end_timeout)
+    wait_for_states(client, [bot1_id, bot2_id, recorder_id], _pred_ended, "ended", args.end_timeout)
 
     # 6) Verify that the transcription has the correct diarization.
     # Strategy:
@@ -249,9 +265,12 @@ def main():
     if args.verbose:
         print(f"Transcript: {transcript}")
 
-    # Get list of all utterances for speaker_1
-    speaker1_utterances = [utterance["transcription"]["transcript"] for utterance in transcript if utterance.get("speaker_name") == bot1_name]
-    speaker2_utterances = [utterance["transcription"]["transcript"] for utterance in transcript if utterance.get("speaker_name") == bot2_name]
+    # Bucket the utterances by speaker in a single pass over the transcript
+    utterances_by_speaker = defaultdict(list)
+    for utterance in transcript:
+        utterances_by_speaker[utterance.get("speaker_name")].append(utterance["transcription"]["transcript"])
+    speaker1_utterances = utterances_by_speaker[bot1_name]
+    speaker2_utterances = utterances_by_speaker[bot2_name]
 
     print(f"Speaker 1 utterances: {' '.join(speaker1_utterances)}")
     print(f"Speaker 2 utterances: {' '.join(speaker2_utterances)}")
@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from bots.bot_controller import realtime_audio_output_manager
+from bots.bot_controller.realtime_audio_output_manager import RealtimeAudioOutputManager
+
+INPUT_SAMPLE_RATE = 16000
+OUTPUT_SAMPLE_RATE = 48000
+# 100ms of 16-bit mono audio at the input sample rate
+CHUNK_SIZE_BYTES = 2 * INPUT_SAMPLE_RATE // 10
+
+
+def _pcm(sample_count, start=0):
+    return np.arange(start, start + sample_count, dtype=np.int16).tobytes()
+
+
+class TestRealtimeAudioOutputManager(unittest.TestCase):
+    def setUp(self):
+        """Set up common test fixtures."""
+        self.played_chunks = []
+        self.played_chunks_changed = threading.Condition()
+        self.manager = RealtimeAudioOutputManager(
+            play_raw_audio_callback=self._play_raw_audio,
+            sleep_time_between_chunks_seconds=0,
+            output_sample_rate=OUTPUT_SAMPLE_RATE,
+        )
+        self.addCleanup(self.manager.cleanup)
+
+    def _play_raw_audio(self, bytes, sample_rate):
+        with self.played_chunks_changed:
+            self.played_chunks.append((bytes, sample_rate))
+            self.played_chunks_changed.notify_all()
+
+    def _wait_for_played_chunks(self, count):
+        with self.played_chunks_changed:
+            self.assertTrue(self.played_chunks_changed.wait_for(lambda: len(self.played_chunks) >= count, timeout=5))
+
+    def test_chunks_are_split_and_played_in_order(self):
+        """Test that added audio is split into 100ms chunks, upsampled by repeating samples and played in order."""
+        samples_per_chunk = CHUNK_SIZE_BYTES // 2
+        # Two and a half chunks in one go, then the other half of the third chunk
+        audio = _pcm(samples_per_chunk * 3)
+        self.manager.add_chunk(audio[: CHUNK_SIZE_BYTES * 5 // 2], INPUT_SAMPLE_RATE)
+        self.manager.add_chunk(audio[CHUNK_SIZE_BYTES * 5 // 2 :], INPUT_SAMPLE_RATE)
+        self._wait_for_played_chunks(3)
+
+        self.assertEqual(len(self.played_chunks), 3)
+        for i, (played_bytes, sample_rate) in enumerate(self.played_chunks):
+            samples = np.frombuffer(audio[i * CHUNK_SIZE_BYTES : (i + 1) * CHUNK_SIZE_BYTES], dtype=np.int16)
+            self.assertIsInstance(played_bytes, bytes)
+            self.assertEqual(played_bytes, np.repeat(samples, OUTPUT_SAMPLE_RATE // INPUT_SAMPLE_RATE).tobytes())
+            self.assertEqual(sample_rate, OUTPUT_SAMPLE_RATE)
+
+    def test_cleanup_wakes_idle_thread(self):
+        """Test that cleanup wakes the audio thread while it waits for chunks and joins it promptly."""
+        self.manager.add_chunk(_pcm(CHUNK_SIZE_BYTES // 2), INPUT_SAMPLE_RATE)
+        self._wait_for_played_chunks(1)
+        audio_thread = self.manager.audio_thread
+        self.assertTrue(audio_thread.is_alive())
+
+        start = time.monotonic()
+        self.manager.cleanup()
+
+        # The idle timeout is 10 seconds, so this only passes if cleanup interrupted the wait
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(audio_thread.is_alive())
+
+    def test_thread_exits_after_idle_timeout(self):
+        """Test that the audio thread exits once no chunks have arrived for the idle timeout."""
+        fake_now = [1000.0]
+        mock_time = Mock()
+        mock_time.monotonic.side_effect = lambda: fake_now[0]
+
+        with patch.object(realtime_audio_output_manager, "time", mock_time):
+            manager = RealtimeAudioOutputManager(
+                play_raw_audio_callback=Mock(side_effect=lambda **kwargs: fake_now.__setitem__(0, 1011.0)),
+                sleep_time_between_chunks_seconds=0,
+                output_sample_rate=OUTPUT_SAMPLE_RATE,
+            )
+            self.addCleanup(manager.cleanup)
+
+            # Playing the chunk moves the clock past the 10 second idle timeout
+            manager.add_chunk(_pcm(CHUNK_SIZE_BYTES // 2), INPUT_SAMPLE_RATE)
+            manager.audio_thread.join(timeout=5)
+
+        self.assertFalse(manager.audio_thread.is_alive())
+        manager.play_raw_audio_callback.assert_called_once()
+
+    def test_upsample_same_sample_rate_returns_chunk(self):
+        """Test that no upsampling is done when the sample rates match."""
+        chunk = _pcm(CHUNK_SIZE_BYTES // 2)
+
+        upsampled = self.manager.upsample_chunk_to_output_sample_rate(chunk, OUTPUT_SAMPLE_RATE)
+
+        self.assertIsInstance(upsampled, bytes)
+        self.assertEqual(upsampled, chunk)
@@ -1,20 +1,152 @@
 import os
 import unittest
-from unittest.mock import MagicMock, Mock, call, patch
+from unittest.mock import Mock, call, patch
 
+from bots.bot_controller import webpage_streamer_manager
 from bots.bot_controller.webpage_streamer_manager import WebpageStreamerManager
 
+# Streaming service responses. The manager only reads .json() and .status_code, so they can be shared across tests.
+OFFER_OK = Mock()
+OFFER_OK.json.return_value = {"answer": "test_answer"}
+START_OK = Mock(status_code=200)
+START_FAIL = Mock(status_code=500)
+UPDATE_OK = Mock(status_code=200)
+UPDATE_FAIL = Mock(status_code=500)
+KEEPALIVE_OK = Mock(status_code=200)
+SHUTDOWN_OK = Mock()
+SHUTDOWN_OK.json.return_value = {"status": "shutdown"}
+
+# requests.post side effects. Tuples, so the scenario tables below share them instead of building a list per test.
+START_RESPONSES = (OFFER_OK, START_OK)
+START_AND_UPDATE_RESPONSES = (OFFER_OK, START_OK, UPDATE_OK)
+START_FAIL_RESPONSES = (OFFER_OK, START_FAIL)
+
+# Each scenario feeds the (url, output_destination) updates to a fresh manager, in order
+UPDATE_SCENARIOS = [
+    {
+        "name": "first_time_with_url",
+        "updates": [("https://example.com", "screenshare")],
+        "expected_last_non_empty_urls": ["https://example.com"],
+        "expected_url": "https://example.com",
+        "expected_output_destination": "screenshare",
+        "post_responses": START_RESPONSES,
+        "expected_play_calls": [call("screenshare")],
+        "expected_stop_count": 0,
+        "expected_sleep_calls": [],
+    },
+    {
+        # Should call update_webrtc_connection, but not play again because only the url changed
+        "name": "only_url_changed_same_destination",
+        "updates": [("https://example.com", "screenshare"), ("https://newurl.com", "screenshare")],
+        "expected_last_non_empty_urls": ["https://example.com", "https://newurl.com"],
+        "expected_url": "https://newurl.com",
+        "expected_output_destination": "screenshare",
+        "post_responses": START_AND_UPDATE_RESPONSES,
+        "expected_play_calls": [call("screenshare")],
+        "expected_stop_count": 0,
+        "expected_sleep_calls": [],
+    },
+    {
+        "name": "output_destination_changed",
+        "updates": [("https://example.com", "screenshare"), ("https://example.com", "webcam")],
+        "expected_last_non_empty_urls": ["https://example.com", "https://example.com"],
+        "expected_url": "https://example.com",
+        "expected_output_destination": "webcam",
+        "post_responses": START_RESPONSES,
+        "expected_play_calls": [call("screenshare"), call("webcam")],
+        "expected_stop_count": 1,
+        "expected_sleep_calls": [call(1)],
+    },
+    {
+        # Should sleep twice: once for destination change, once for URL+destination change with different URL
+        "name": "url_and_destination_changed",
+        "updates": [("https://example.com", "webcam"), ("https://example.com", "screenshare"), ("https://newurl.com", "webcam")],
+        "expected_last_non_empty_urls": ["https://example.com", "https://example.com", "https://newurl.com"],
+        "expected_url": "https://newurl.com",
+        "expected_output_destination": "webcam",
+        "post_responses": START_AND_UPDATE_RESPONSES,
+        "expected_play_calls": [call("webcam"), call("screenshare"), call("webcam")],
+        "expected_stop_count": 2,
+        "expected_sleep_calls": [call(1), call(1)],
+    },
+    {
+        # last_non_empty_url should remain as the last non-empty value
+        "name": "url_becomes_empty",
+        "updates": [("https://example.com", "screenshare"), ("", "screenshare")],
+        "expected_last_non_empty_urls": ["https://example.com", "https://example.com"],
+        "expected_url": "",
+        "expected_output_destination": "screenshare",
+        "post_responses": START_RESPONSES,
+        "expected_play_calls": [call("screenshare")],
+        "expected_stop_count": 1,
+        "expected_sleep_calls": [],
+    },
+    {
+        # Calling with the same values should not make any callbacks
+        "name": "no_change",
+        "updates": [("https://example.com", "screenshare"), ("https://example.com", "screenshare")],
+        "expected_last_non_empty_urls": ["https://example.com", "https://example.com"],
+        "expected_url": "https://example.com",
+        "expected_output_destination": "screenshare",
+        "post_responses": START_RESPONSES,
+        "expected_play_calls": [call("screenshare")],
+        "expected_stop_count": 0,
+        "expected_sleep_calls": [],
+    },
+    {
+        "name": "tracks_last_non_empty_url",
+        "updates": [("https://first.com", "screenshare"), ("https://second.com", "screenshare"), ("", "screenshare")],
+        "expected_last_non_empty_urls": ["https://first.com", "https://second.com", "https://second.com"],
+        "expected_url": "",
+        "expected_output_destination": "screenshare",
+        "post_responses": START_AND_UPDATE_RESPONSES,
+        "expected_play_calls": [call("screenshare")],
+        "expected_stop_count": 1,
+        "expected_sleep_calls": [],
+    },
+]
+
 
 class TestWebpageStreamerManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Build the callback mocks once for the whole class, they are reset before each test."""
+        super().setUpClass()
+        cls.get_peer_connection_offer_callback = Mock()
+        cls.start_peer_connection_callback = Mock()
+        cls.play_bot_output_media_stream_callback = Mock()
+        cls.stop_bot_output_media_stream_callback = Mock()
+        cls.webpage_streamer_service_hostname = "test-hostname"
+
     def setUp(self):
         """Set up common test fixtures."""
-        self.get_peer_connection_offer_callback = MagicMock(return_value={"sdp": "test_sdp", "type": "offer"})
-        self.start_peer_connection_callback = MagicMock()
-        self.play_bot_output_media_stream_callback = MagicMock()
-        self.stop_bot_output_media_stream_callback = MagicMock()
-        self.webpage_streamer_service_hostname = "test-hostname"
-
-        self.manager = WebpageStreamerManager(
+        # No test should reach the streaming service, really sleep or start the keepalive thread
+        self.mock_post = self._start_patch(webpage_streamer_manager.requests, "post")
+        self.mock_sleep = self._start_patch(webpage_streamer_manager.time, "sleep")
+        self.mock_thread = self._start_patch(webpage_streamer_manager.threading, "Thread")
+
+        self.manager = self._create_manager()
+
+    def _start_patch(self, target, attribute):
+        # patch.object on the already imported modules, instead of resolving a dotted path on every test.
+        # Nothing here needs MagicMock's magic methods, so the patches use plain Mocks.
+        patcher = patch.object(target, attribute, new_callable=Mock)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _create_manager(self):
+        """Reset the callback mocks and build a fresh WebpageStreamerManager around them."""
+        # Clear calls and any return values / side effects configured by the previous test
+        for callback in (
+            self.get_peer_connection_offer_callback,
+            self.start_peer_connection_callback,
+            self.play_bot_output_media_stream_callback,
+            self.stop_bot_output_media_stream_callback,
+        ):
+            callback.reset_mock(return_value=True, side_effect=True)
+        self.get_peer_connection_offer_callback.return_value = {"sdp": "test_sdp", "type": "offer"}
+
+        return WebpageStreamerManager(
             get_peer_connection_offer_callback=self.get_peer_connection_offer_callback,
             start_peer_connection_callback=self.start_peer_connection_callback,
             play_bot_output_media_stream_callback=self.play_bot_output_media_stream_callback,
@@ -44,424 +176,160 @@ class TestWebpageStreamerManager(unittest.TestCase):
 
     def test_streaming_service_hostname_docker_compose(self):
         """Test streaming_service_hostname returns correct hostname for docker compose."""
-        with patch.dict(os.environ, {}, clear=True):
+        # Only unset LAUNCH_BOT_METHOD instead of clearing the whole environment
+        with patch.dict(os.environ):
+            os.environ.pop("LAUNCH_BOT_METHOD", None)
             hostname = self.manager.streaming_service_hostname()
             self.assertEqual(hostname, "attendee-webpage-streamer-local")
 
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_first_time_with_url(self, mock_post, mock_thread):
-        """Test update when streaming hasn't started yet."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response]
-
-        self.manager.update("https://example.com", "screenshare")
-
-        self.assertEqual(self.manager.url, "https://example.com")
-        self.assertEqual(self.manager.output_destination, "screenshare")
-        self.assertEqual(self.manager.last_non_empty_url, "https://example.com")
-        self.get_peer_connection_offer_callback.assert_called_once()
-        self.start_peer_connection_callback.assert_called_once_with({"answer": "test_answer"})
-        self.play_bot_output_media_stream_callback.assert_called_once_with("screenshare")
-        self.assertTrue(self.manager.webrtc_connection_started)
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_url_changed(self, mock_post, mock_thread):
-        """Test update when URL has changed."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        # First setup initial state
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_update_response = Mock()
-        mock_update_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response, mock_update_response]
-
-        self.manager.update("https://example.com", "screenshare")
-
-        # Now change the URL
-        self.manager.update("https://newurl.com", "screenshare")
-
-        self.assertEqual(self.manager.url, "https://newurl.com")
-        self.assertEqual(self.manager.last_non_empty_url, "https://newurl.com")
-        # Should call update_webrtc_connection
-        self.assertEqual(mock_post.call_count, 3)
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.time.sleep")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_output_destination_changed(self, mock_post, mock_sleep, mock_thread):
-        """Test update when output destination has changed."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        # First setup initial state
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response]
-
-        self.manager.update("https://example.com", "screenshare")
-
-        # Now change the output destination
-        self.manager.update("https://example.com", "webcam")
-
-        self.assertEqual(self.manager.output_destination, "webcam")
-        self.stop_bot_output_media_stream_callback.assert_called_once()
-        # Should call play with new destination
-        self.assertEqual(self.play_bot_output_media_stream_callback.call_count, 2)
-        self.play_bot_output_media_stream_callback.assert_called_with("webcam")
-        mock_sleep.assert_called_once_with(1)
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.time.sleep")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_url_and_destination_changed(self, mock_post, mock_sleep, mock_thread):
-        """Test update when both URL and output destination have changed."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        # First setup initial state
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_update_response = Mock()
-        mock_update_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response, mock_update_response]
-
-        self.manager.update("https://example.com", "webcam")
-        self.manager.update("https://example.com", "screenshare")
-
-        # Now change both
-        self.manager.update("https://newurl.com", "webcam")
-
-        self.assertEqual(self.manager.url, "https://newurl.com")
-        self.assertEqual(self.manager.output_destination, "webcam")
-        # Should be called twice: once for the initial state, once for the change
-        self.assertListEqual(self.stop_bot_output_media_stream_callback.call_args_list, [call(), call()])
-        self.assertEqual(self.play_bot_output_media_stream_callback.call_count, 3)
-        # Should sleep twice: once for destination change, once for URL+destination change with different URL
-        self.assertEqual(mock_sleep.call_count, 2)
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_url_becomes_empty(self, mock_post, mock_thread):
-        """Test update when URL becomes empty."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        # First setup initial state
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response]
-
-        self.manager.update("https://example.com", "screenshare")
-
-        # Now set URL to empty
-        self.manager.update("", "screenshare")
-
-        self.assertEqual(self.manager.url, "")
-        self.stop_bot_output_media_stream_callback.assert_called_once()
-        # last_non_empty_url should remain as the last non-empty value
-        self.assertEqual(self.manager.last_non_empty_url, "https://example.com")
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_no_change(self, mock_post, mock_thread):
-        """Test update when nothing has changed."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        # First setup initial state
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response]
-
-        self.manager.update("https://example.com", "screenshare")
-
-        # Reset mocks
-        self.play_bot_output_media_stream_callback.reset_mock()
-        self.stop_bot_output_media_stream_callback.reset_mock()
-
-        # Call with same values
-        self.manager.update("https://example.com", "screenshare")
-
-        # Should not make any callbacks
-        self.play_bot_output_media_stream_callback.assert_not_called()
-        self.stop_bot_output_media_stream_callback.assert_not_called()
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_start_or_update_webrtc_connection_first_time(self, mock_post, mock_thread):
-        """Test starting WebRTC connection for the first time."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response]
-
-        self.manager.start_or_update_webrtc_connection("https://example.com")
-
-        self.get_peer_connection_offer_callback.assert_called_once()
-        self.start_peer_connection_callback.assert_called_once_with({"answer": "test_answer"})
-        self.assertTrue(self.manager.webrtc_connection_started)
-        # Should start keepalive task
-        self.assertIsNotNone(self.manager.webpage_streamer_keepalive_task)
-
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_start_or_update_webrtc_connection_with_error(self, mock_post):
-        """Test starting WebRTC connection when there's an error in offer."""
-        self.get_peer_connection_offer_callback.return_value = {"error": "test_error"}
-
-        self.manager.start_or_update_webrtc_connection("https://example.com")
-
-        self.get_peer_connection_offer_callback.assert_called_once()
-        self.start_peer_connection_callback.assert_not_called()
-        self.assertFalse(self.manager.webrtc_connection_started)
-        mock_post.assert_not_called()
-
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_start_or_update_webrtc_connection_failed_start(self, mock_post):
-        """Test starting WebRTC connection when start_streaming fails."""
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 500
-        mock_post.side_effect = [mock_offer_response, mock_start_response]
-
-        self.manager.start_or_update_webrtc_connection("https://example.com")
-
-        self.get_peer_connection_offer_callback.assert_called_once()
-        self.start_peer_connection_callback.assert_called_once()
-        self.assertFalse(self.manager.webrtc_connection_started)
-        # Should not start keepalive task
-        self.assertIsNone(self.manager.webpage_streamer_keepalive_task)
-
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_webrtc_connection(self, mock_post):
+    def test_update(self):
+        """Test update across the sequences of url / output destination changes in UPDATE_SCENARIOS."""
+        for scenario in UPDATE_SCENARIOS:
+            with self.subTest(scenario=scenario["name"]):
+                self.manager = self._create_manager()
+                self.mock_post.reset_mock()
+                self.mock_sleep.reset_mock()
+                # The first post calls start the connection, every later one updates the url
+                self.mock_post.side_effect = scenario["post_responses"]
+
+                for (url, output_destination), expected_last_non_empty_url in zip(scenario["updates"], scenario["expected_last_non_empty_urls"]):
+                    self.manager.update(url, output_destination)
+                    self.assertEqual(self.manager.last_non_empty_url, expected_last_non_empty_url)
+
+                self.assertEqual(self.manager.url, scenario["expected_url"])
+                self.assertEqual(self.manager.output_destination, scenario["expected_output_destination"])
+                # The connection is only started once, later url changes go through update_webrtc_connection
+                self.get_peer_connection_offer_callback.assert_called_once()
+                self.start_peer_connection_callback.assert_called_once_with({"answer": "test_answer"})
+                self.assertTrue(self.manager.webrtc_connection_started)
+                self.assertEqual(self.mock_post.call_count, len(scenario["post_responses"]))
+                self.assertListEqual(self.play_bot_output_media_stream_callback.call_args_list, scenario["expected_play_calls"])
+                self.assertEqual(self.stop_bot_output_media_stream_callback.call_count, scenario["expected_stop_count"])
+                self.assertListEqual(self.mock_sleep.call_args_list, scenario["expected_sleep_calls"])
+
+    def test_start_or_update_webrtc_connection(self):
+        """Test starting WebRTC connection for the first time, when there's an error in offer and when start_streaming fails."""
+        offer = {"sdp": "test_sdp", "type": "offer"}
+        # (name, peer connection offer, post responses, expected start_peer_connection calls, expected connection started)
+        start_scenarios = [
+            ("first_time", offer, START_RESPONSES, [call({"answer": "test_answer"})], True),
+            # Should not post anything to the streaming service
+            ("with_error", {"error": "test_error"}, (), [], False),
+            ("failed_start", offer, START_FAIL_RESPONSES, [call({"answer": "test_answer"})], False),
+        ]
+
+        for name, peer_connection_offer, post_responses, expected_start_peer_connection_calls, expected_started in start_scenarios:
+            with self.subTest(scenario=name):
+                self.manager = self._create_manager()
+                self.mock_post.reset_mock()
+                self.get_peer_connection_offer_callback.return_value = peer_connection_offer
+                self.mock_post.side_effect = post_responses
+
+                self.manager.start_or_update_webrtc_connection("https://example.com")
+
+                self.get_peer_connection_offer_callback.assert_called_once()
+                self.assertListEqual(self.start_peer_connection_callback.call_args_list, expected_start_peer_connection_calls)
+                self.assertEqual(self.mock_post.call_count, len(post_responses))
+                self.assertEqual(self.manager.webrtc_connection_started, expected_started)
+                # The keepalive task should only be started once streaming has started
+                self.assertEqual(self.manager.webpage_streamer_keepalive_task is not None, expected_started)
+
+    def test_update_webrtc_connection(self):
         """Test updating an existing WebRTC connection."""
-        mock_update_response = Mock()
-        mock_update_response.status_code = 200
-        mock_post.return_value = mock_update_response
+        self.mock_post.return_value = UPDATE_OK
 
         self.manager.update_webrtc_connection("https://newurl.com")
 
-        mock_post.assert_called_once()
-        call_args = mock_post.call_args
+        self.mock_post.assert_called_once()
+        call_args = self.mock_post.call_args
         self.assertIn("start_streaming", call_args[0][0])
         self.assertEqual(call_args[1]["json"]["url"], "https://newurl.com")
 
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_webrtc_connection_failed(self, mock_post):
+    def test_update_webrtc_connection_failed(self):
         """Test updating WebRTC connection when it fails."""
-        mock_update_response = Mock()
-        mock_update_response.status_code = 500
-        mock_post.return_value = mock_update_response
+        self.mock_post.return_value = UPDATE_FAIL
 
         self.manager.update_webrtc_connection("https://newurl.com")
 
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
 
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_cleanup(self, mock_post):
+    def test_cleanup(self):
         """Test cleanup method."""
-        mock_shutdown_response = Mock()
-        mock_shutdown_response.json.return_value = {"status": "shutdown"}
-        mock_post.return_value = mock_shutdown_response
+        self.mock_post.return_value = SHUTDOWN_OK
 
         self.manager.cleanup()
 
         self.assertTrue(self.manager.cleaned_up)
-        mock_post.assert_called_once()
-        call_args = mock_post.call_args
+        self.mock_post.assert_called_once()
+        call_args = self.mock_post.call_args
         self.assertIn("shutdown", call_args[0][0])
 
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_cleanup_with_exception(self, mock_post):
+    def test_cleanup_with_exception(self):
         """Test cleanup method when shutdown request raises an exception."""
-        mock_post.side_effect = Exception("Network error")
+        self.mock_post.side_effect = Exception("Network error")
 
         # Should not raise exception
         self.manager.cleanup()
 
         self.assertTrue(self.manager.cleaned_up)
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
 
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_send_webpage_streamer_shutdown_request(self, mock_post):
+    def test_send_webpage_streamer_shutdown_request(self):
         """Test sending shutdown request."""
-        mock_shutdown_response = Mock()
-        mock_shutdown_response.json.return_value = {"status": "shutdown"}
-        mock_post.return_value = mock_shutdown_response
+        self.mock_post.return_value = SHUTDOWN_OK
 
         self.manager.send_webpage_streamer_shutdown_request()
 
-        mock_post.assert_called_once()
-        call_args = mock_post.call_args
+        self.mock_post.assert_called_once()
+        call_args = self.mock_post.call_args
         self.assertIn("shutdown", call_args[0][0])
 
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_send_webpage_streamer_shutdown_request_with_exception(self, mock_post):
+    def test_send_webpage_streamer_shutdown_request_with_exception(self):
         """Test sending shutdown request when it raises an exception."""
-        mock_post.side_effect = Exception("Network error")
+        self.mock_post.side_effect = Exception("Network error")
 
         # Should not raise exception
         self.manager.send_webpage_streamer_shutdown_request()
 
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
 
-    @patch("bots.bot_controller.webpage_streamer_manager.time.sleep")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_send_webpage_streamer_keepalive_periodically(self, mock_post, mock_sleep):
-        """Test keepalive task sends requests periodically."""
-        mock_keepalive_response = Mock()
-        mock_keepalive_response.status_code = 200
-        mock_post.return_value = mock_keepalive_response
-
-        # Make sleep raise exception after 2 calls to exit the loop
+    def _stop_keepalive_after_sleeps(self, sleep_count):
+        """Return a time.sleep side effect that cleans up the manager on the sleep_count-th sleep."""
         call_count = [0]
 
         def sleep_side_effect(seconds):
             call_count[0] += 1
-            if call_count[0] >= 2:
+            if call_count[0] >= sleep_count:
                 self.manager.cleaned_up = True
 
-        mock_sleep.side_effect = sleep_side_effect
-
-        self.manager.send_webpage_streamer_keepalive_periodically()
-
-        # Should have called sleep twice and sent one keepalive request
-        self.assertEqual(mock_sleep.call_count, 2)
-        mock_post.assert_called_once()
-        call_args = mock_post.call_args
-        self.assertIn("keepalive", call_args[0][0])
-
-    @patch("bots.bot_controller.webpage_streamer_manager.time.sleep")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_send_webpage_streamer_keepalive_with_exception(self, mock_post, mock_sleep):
-        """Test keepalive task continues even when request fails."""
-        mock_post.side_effect = Exception("Network error")
-
-        # Make sleep exit after 2 calls
-        call_count = [0]
-
-        def sleep_side_effect(seconds):
-            call_count[0] += 1
-            if call_count[0] >= 2:
-                self.manager.cleaned_up = True
-
-        mock_sleep.side_effect = sleep_side_effect
-
-        # Should not raise exception
-        self.manager.send_webpage_streamer_keepalive_periodically()
-
-        self.assertEqual(mock_sleep.call_count, 2)
-        mock_post.assert_called_once()
-
-    @patch("bots.bot_controller.webpage_streamer_manager.time.sleep")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_keepalive_stops_when_cleaned_up(self, mock_post, mock_sleep):
-        """Test keepalive task stops when manager is cleaned up."""
-        mock_keepalive_response = Mock()
-        mock_keepalive_response.status_code = 200
-        mock_post.return_value = mock_keepalive_response
-
-        # Set cleaned_up after first sleep
-        def sleep_side_effect(seconds):
-            self.manager.cleaned_up = True
-
-        mock_sleep.side_effect = sleep_side_effect
-
-        self.manager.send_webpage_streamer_keepalive_periodically()
-
-        # Should have called sleep once and not sent any keepalive (exited before check)
-        mock_sleep.assert_called_once_with(60)
-        mock_post.assert_not_called()
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.time.sleep")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_only_url_changed_same_destination(self, mock_post, mock_sleep, mock_thread):
-        """Test update when only URL changed but destination stayed the same."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        # First setup initial state
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_update_response = Mock()
-        mock_update_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response, mock_update_response]
-
-        self.manager.update("https://example.com", "screenshare")
-
-        # Reset mock
-        self.play_bot_output_media_stream_callback.reset_mock()
-
-        # Change only URL, keep same destination
-        self.manager.update("https://newurl.com", "screenshare")
-
-        self.assertEqual(self.manager.url, "https://newurl.com")
-        self.assertEqual(self.manager.output_destination, "screenshare")
-        # Should not call play_bot_output_media_stream_callback because only_change_was_url is True
-        self.play_bot_output_media_stream_callback.assert_not_called()
-        # Should not sleep
-        mock_sleep.assert_not_called()
-
-    @patch("bots.bot_controller.webpage_streamer_manager.threading.Thread")
-    @patch("bots.bot_controller.webpage_streamer_manager.requests.post")
-    def test_update_tracks_last_non_empty_url(self, mock_post, mock_thread):
-        """Test that last_non_empty_url is properly tracked."""
-        # Mock the thread to prevent keepalive from actually running
-        mock_thread_instance = Mock()
-        mock_thread.return_value = mock_thread_instance
-
-        mock_offer_response = Mock()
-        mock_offer_response.json.return_value = {"answer": "test_answer"}
-        mock_start_response = Mock()
-        mock_start_response.status_code = 200
-        mock_update_response = Mock()
-        mock_update_response.status_code = 200
-        mock_post.side_effect = [mock_offer_response, mock_start_response, mock_update_response]
-
-        # Set first URL
-        self.manager.update("https://first.com", "screenshare")
-        self.assertEqual(self.manager.last_non_empty_url, "https://first.com")
-
-        # Change to second URL
-        self.manager.update("https://second.com", "screenshare")
-        self.assertEqual(self.manager.last_non_empty_url, "https://second.com")
-
-        # Set empty URL
-        self.manager.update("", "screenshare")
-        # last_non_empty_url should still be the second URL
-        self.assertEqual(self.manager.last_non_empty_url, "https://second.com")
+        return sleep_side_effect
+
+    def test_send_webpage_streamer_keepalive_periodically(self):
+        """Test keepalive task sends requests periodically, keeps going when a request fails and stops when cleaned up."""
+        # (name, sleeps before cleanup, post response or exception, expected keepalive requests)
+        keepalive_scenarios = [
+            # Sleeps twice and sends one keepalive request in between
+            ("periodically", 2, KEEPALIVE_OK, 1),
+            # Should not raise exception
+            ("with_exception", 2, Exception("Network error"), 1),
+            # Exits after the first sleep, before sending any keepalive
+            ("stops_when_cleaned_up", 1, KEEPALIVE_OK, 0),
+        ]
+
+        for name, sleep_count, post_response, expected_post_count in keepalive_scenarios:
+            with self.subTest(scenario=name):
+                self.manager = self._create_manager()
+                self.mock_post.reset_mock(return_value=True, side_effect=True)
+                self.mock_sleep.reset_mock()
+                if isinstance(post_response, Exception):
+                    self.mock_post.side_effect = post_response
+                else:
+                    self.mock_post.return_value = post_response
+                self.mock_sleep.side_effect = self._stop_keepalive_after_sleeps(sleep_count)
+
+                self.manager.send_webpage_streamer_keepalive_periodically()
+
+                self.assertListEqual(self.mock_sleep.call_args_list, [call(60)] * sleep_count)
+                self.assertEqual(self.mock_post.call_count, expected_post_count)
+                for call_args in self.mock_post.call_args_list:
+                    self.assertIn("keepalive", call_args[0][0])
@@ -0,0 +1,99 @@
+import http.client
+import os
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+from bots.zoom_web_bot_adapter import zoom_web_static_server
+from bots.zoom_web_bot_adapter.zoom_web_static_server import start_zoom_web_static_server
+
+ZOOM_WEB_BOT_ADAPTER_DIR = os.path.dirname(os.path.abspath(zoom_web_static_server.__file__))
+
+# Content types come from mimetypes, which maps .js differently depending on the system's mime.types
+EXPECTED_CONTENT_TYPES = {
+    "/zoom_web_chromedriver_page.html": ("text/html",),
+    "/zoom_web_chromedriver_page.js": ("text/javascript", "application/javascript"),
+    "/zoom_web_chromedriver_style.css": ("text/css",),
+}
+
+
+class TestZoomWebStaticServer(unittest.TestCase):
+    def setUp(self):
+        """Start a static server with the one hour shutdown scheduled, like outside of kubernetes."""
+        self.fake_now = 1000.0
+        mock_time = Mock()
+        mock_time.monotonic.side_effect = lambda: self.fake_now
+
+        # The deadline is set from this clock and service_actions keeps reading it for the rest of the test
+        time_patcher = patch.object(zoom_web_static_server, "time", mock_time)
+        time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+        with patch.dict(os.environ), patch.object(zoom_web_static_server.atexit, "register") as mock_atexit_register:
+            os.environ.pop("LAUNCH_BOT_METHOD", None)
+            self.port = start_zoom_web_static_server()
+
+        # Shut the server down at the end of the test instead of at exit
+        self.addCleanup(mock_atexit_register.call_args[0][0])
+
+    def _request(self, method, path):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        self.addCleanup(connection.close)
+        connection.request(method, path)
+        response = connection.getresponse()
+        return response, response.read()
+
+    def assertHasCrossOriginIsolationHeaders(self, response):
+        self.assertEqual(response.getheader("Cross-Origin-Opener-Policy"), "same-origin")
+        self.assertEqual(response.getheader("Cross-Origin-Embedder-Policy"), "require-corp")
+
+    def test_get_whitelisted_files(self):
+        """Test that every whitelisted file is served with its content type and length."""
+        for path, content_types in EXPECTED_CONTENT_TYPES.items():
+            with self.subTest(path=path):
+                response, body = self._request("GET", path)
+
+                with open(os.path.join(ZOOM_WEB_BOT_ADAPTER_DIR, path.lstrip("/")), "rb") as f:
+                    expected_body = f.read()
+                self.assertEqual(response.status, 200)
+                self.assertIn(response.getheader("Content-Type"), content_types)
+                self.assertEqual(response.getheader("Content-Length"), str(len(expected_body)))
+                self.assertEqual(body, expected_body)
+                self.assertHasCrossOriginIsolationHeaders(response)
+
+    def test_get_non_whitelisted_paths(self):
+        """Test that anything outside the whitelist, including whitelisted files with a query string, is a 404."""
+        for path in ["/", "/zoom_web_chromedriver_payload.js", "/zoom_web_static_server.py", "/../zoom_web_chromedriver_page.html", "/zoom_web_chromedriver_page.html?foo=bar"]:
+            with self.subTest(path=path):
+                response, _ = self._request("GET", path)
+
+                self.assertEqual(response.status, 404)
+                self.assertHasCrossOriginIsolationHeaders(response)
+
+    def test_head_returns_no_body(self):
+        """Test that HEAD sends the same headers as GET without the body."""
+        response, body = self._request("HEAD", "/zoom_web_chromedriver_page.js")
+
+        self.assertEqual(response.status, 200)
+        self.assertIn(response.getheader("Content-Type"), EXPECTED_CONTENT_TYPES["/zoom_web_chromedriver_page.js"])
+        self.assertEqual(response.getheader("Content-Length"), str(os.path.getsize(os.path.join(ZOOM_WEB_BOT_ADAPTER_DIR, "zoom_web_chromedriver_page.js"))))
+        self.assertEqual(body, b"")
+        self.assertHasCrossOriginIsolationHeaders(response)
+
+    def test_shutdown_after_deadline(self):
+        """Test that the server shuts itself down once the shutdown deadline has passed."""
+        response, _ = self._request("GET", "/zoom_web_chromedriver_page.html")
+        self.assertEqual(response.status, 200)
+
+        # Move the clock past the one hour deadline. The server checks it on every serve_forever poll.
+        self.fake_now += 60 * 60 + 1
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                self._request("GET", "/zoom_web_chromedriver_page.html")
+            # A connection accepted between shutdown() and server_close() is reset when the socket closes
+            except (ConnectionError, http.client.RemoteDisconnected):
+                break
+            time.sleep(0.1)
+        else:
+            self.fail("Static server did not shut down after the shutdown deadline")
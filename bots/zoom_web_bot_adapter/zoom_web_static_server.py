@@ -1,53 +1,88 @@
 import atexit
+import mimetypes
 import os
 import threading
-from functools import partial
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 
-class _COOPCOEPHandler(SimpleHTTPRequestHandler):
-    # directory is set dynamically below
-    directory = None
-
-    # Whitelist of allowed files
+class _COOPCOEPHandler(BaseHTTPRequestHandler):
+    # Whitelist of allowed files. Only these are loaded into static_files, so static_files is the whitelist at request time
     ALLOWED_FILES = {
         "/zoom_web_chromedriver_page.html",
         "/zoom_web_chromedriver_page.js",
         "/zoom_web_chromedriver_style.css",
     }
 
+    _COOP_COEP_HEADER_BYTES = b"Cross-Origin-Opener-Policy: same-origin\r\nCross-Origin-Embedder-Policy: require-corp\r\n"
+
+    # path -> (body, content type) for every whitelisted file, loaded once by start_zoom_web_static_server
+    static_files = None
+
     def do_GET(self):
-        # Check if the requested file is in the whitelist
-        if self.path not in self.ALLOWED_FILES:
+        self._send_static_file(include_body=True)
+
+    def do_HEAD(self):
+        self._send_static_file(include_body=False)
+
+    def _send_static_file(self, include_body):
+        # A single lookup both checks the whitelist and gets the file
+        static_file = self.static_files.get(self.path)
+        if static_file is None:
             self.send_error(404, "File not found...")
             return
 
-        # If whitelisted, proceed with normal file serving
-        super().do_GET()
+        # If whitelisted, serve it from memory instead of stat-ing and reading it from disk on every request
+        body, content_type = static_file
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
 
     def end_headers(self):
-        self.send_header("Cross-Origin-Opener-Policy", "same-origin")
-        self.send_header("Cross-Origin-Embedder-Policy", "require-corp")
+        # Same as send_header for the two constant headers, without formatting and encoding them on every response.
+        # send_header skips headers for HTTP/0.9, so we do too.
+        if self.request_version != "HTTP/0.9":
+            self._headers_buffer.append(self._COOP_COEP_HEADER_BYTES)
         super().end_headers()
 
 
-# Super simple static server that serves the zoom web sdk HTML page and adds COOP/COEP headers to enable gallery view
-def start_zoom_web_static_server() -> int:
-    # Bind the directory at construction time (correct way for 3.8+)
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    handler_cls = partial(_COOPCOEPHandler, directory=current_dir)
-    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)  # 0 = choose free port
-    httpd_port = httpd.server_address[1]
-    httpd_thread = threading.Thread(target=httpd.serve_forever, daemon=True)
-    httpd_thread.start()
+class _StaticServer(ThreadingHTTPServer):
+    # time.monotonic() value after which the server shuts itself down, None to keep serving
+    shutdown_deadline = None
 
-    def _shutdown():
+    def service_actions(self):
+        # serve_forever calls this on every poll, so the deadline is checked without a Timer thread sleeping until it
+        super().service_actions()
+        if self.shutdown_deadline is not None and time.monotonic() >= self.shutdown_deadline:
+            self.shutdown_deadline = None
+            # shutdown() waits for serve_forever to return, so it has to be called from another thread
+            threading.Thread(target=self.shutdown_and_close, daemon=True).start()
+
+    def shutdown_and_close(self):
         try:
-            httpd.shutdown()
-            httpd.server_close()
+            self.shutdown()
+            self.server_close()
         except Exception:
             pass
 
+
+# Super simple static server that serves the zoom web sdk HTML page and adds COOP/COEP headers to enable gallery view
+def start_zoom_web_static_server() -> int:
+    # The files are only read from disk the first time a server is started
+    if _COOPCOEPHandler.static_files is None:
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        static_files = {}
+        for path in _COOPCOEPHandler.ALLOWED_FILES:
+            with open(os.path.join(current_dir, path.lstrip("/")), "rb") as f:
+                static_files[path] = (f.read(), mimetypes.guess_type(path)[0] or "application/octet-stream")
+        _COOPCOEPHandler.static_files = static_files
+
+    httpd = _StaticServer(("127.0.0.1", 0), _COOPCOEPHandler)  # 0 = choose free port
+    httpd_port = httpd.server_address[1]
+
     # Schedule automatic shutdown after an hour if we're not on kubernetes.
     # In kubernetes, the server will be shutdown when the pod dies.
     # With celery, it will keep running after the task finishes.
@@ -55,9 +90,10 @@ def start_zoom_web_static_server() -> int:
     # shut it down even if we were using kubernetes, but erroring on the side of caution.
     if os.getenv("LAUNCH_BOT_METHOD") != "kubernetes":
         timeout_seconds = 60 * 60  # 1 hour
-        shutdown_timer = threading.Timer(timeout_seconds, _shutdown)
-        shutdown_timer.daemon = True
-        shutdown_timer.start()
+        httpd.shutdown_deadline = time.monotonic() + timeout_seconds
+
+    httpd_thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    httpd_thread.start()
 
-    atexit.register(_shutdown)
+    atexit.register(httpd.shutdown_and_close)
     return httpd_port